@@ -1,15 +1,23 @@
 """
 Module for FVM integration.
 """
+import asyncio
+import weakref
 
+import aiohttp
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.const import (CONF_PASSWORD, CONF_USERNAME,
+                                 EVENT_HOMEASSISTANT_STOP)
+from homeassistant.core import Event
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.helpers.typing import ConfigType, HomeAssistantType
 
-from custom_components.fvm.const import DATA_CONTROLLER, DOMAIN
-from custom_components.fvm.fvm_controller import (FvmController,
-                                                  is_controller_exists,
-                                                  set_controller)
+from .const import DATA_CONTROLLER, DATA_COORDINATOR, DOMAIN
+from .coordinator import FvmCoordinator
+from .fvm_controller import (FvmController, get_controller, remove_controller,
+                             set_controller)
+
+PLATFORMS = ["calendar"]
 
 
 # pylint: disable=unused-argument
@@ -24,7 +32,10 @@ async def async_setup(hass: HomeAssistantType, config: ConfigType) -> bool:
     Returns:
         The value indicates whether the setup succeeded.
     """
-    hass.data[DOMAIN] = {DATA_CONTROLLER: {}}
+    hass.data[DOMAIN] = {
+        DATA_CONTROLLER: weakref.WeakValueDictionary(),
+        DATA_COORDINATOR: {},
+    }
     return True
 
 
@@ -40,17 +51,60 @@ async def async_setup_entry(hass: HomeAssistantType, config_entry: ConfigEntry)
         The value indicates whether the setup succeeded.
     """
 
-    if not is_controller_exists(hass, config_entry.data[CONF_USERNAME]):
-        set_controller(
-            hass,
-            config_entry.data[CONF_USERNAME],
-            FvmController(
-                config_entry.data[CONF_USERNAME], config_entry.data[CONF_PASSWORD]
-            ),
+    controller = FvmController(
+        config_entry.data[CONF_USERNAME], config_entry.data[CONF_PASSWORD]
+    )
+    set_controller(hass, config_entry.entry_id, controller)
+
+    try:
+        await controller.login()
+        coordinator = FvmCoordinator(
+            hass, controller, await controller.get_locations_and_meters()
         )
+        await coordinator.async_config_entry_first_refresh()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+        await controller.close()
+        raise ConfigEntryNotReady(f"Connecting to FVM failed: {error}") from error
+    except (ConfigEntryAuthFailed, ConfigEntryNotReady):
+        await controller.close()
+        raise
+
+    hass.data[DOMAIN][DATA_COORDINATOR][config_entry.entry_id] = coordinator
+
+    async def _async_close_controller(_: Event) -> None:
+        await controller.close()
 
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(config_entry, "calendar")
+    config_entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_controller)
     )
 
+    await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+
     return True
+
+
+async def async_unload_entry(
+    hass: HomeAssistantType, config_entry: ConfigEntry
+) -> bool:
+    """
+    Unloads the config entry and closes the session of its controller.
+
+    Args:
+        hass: The Home Assistant instance.
+        config_entry: The config entry to unload.
+
+    Returns:
+        The value indicates whether the unload succeeded.
+    """
+    unload_ok = await hass.config_entries.async_unload_platforms(
+        config_entry, PLATFORMS
+    )
+
+    if unload_ok:
+        controller = get_controller(hass, config_entry.entry_id)
+        if controller is not None:
+            await controller.close()
+        remove_controller(hass, config_entry.entry_id)
+        hass.data[DOMAIN][DATA_COORDINATOR].pop(config_entry.entry_id, None)
+
+    return unload_ok
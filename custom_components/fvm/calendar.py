@@ -1,44 +1,77 @@
 """
 The calendar module for FVM integration.
 """
+import functools
 import logging
-from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, cast
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time
+from itertools import accumulate
+from typing import List, Optional
 
 from dateutil import tz
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import HomeAssistantType
-from homeassistant.util import Throttle
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from custom_components.fvm.fvm_controller import (FvmController,
-                                                  LocationAndMeter,
-                                                  ReadingTime, get_controller)
+from .const import DATA_COORDINATOR, DOMAIN
+from .coordinator import FvmCoordinator
+from .fvm_controller import LocationAndMeter, ReadingTime
 
 _LOGGER = logging.getLogger(__name__)
 
-MIN_TIME_BETWEEN_UPDATES = timedelta(days=7)
+_LOCAL_ZONE = tz.tzlocal()
 
+_LOCATION = "https://ugyfelszolgalat.vizmuvek.hu/"
 
-class FvmReadingTimeCalendarEventDevice(CalendarEntity):
+
+@functools.lru_cache(maxsize=256)
+def _build_event(start: date, end: date, mode: str) -> CalendarEvent:
+    """
+    Builds the calendar event of a reading time. The events are cached,
+    the same reading time is converted to an event on every calendar query.
+
+    Args:
+        start: The start date of the reading.
+        end: The end date of the reading.
+        mode: The reading mode.
+
+    Returns:
+        The calendar event of the reading time.
+    """
+    return CalendarEvent(
+        start=start,
+        end=end,
+        summary=f"Fővárosi vízművek - {mode}",
+        description=mode,
+        location=_LOCATION,
+    )
+
+
+class FvmReadingTimeCalendarEventDevice(
+    CoordinatorEntity[FvmCoordinator], CalendarEntity
+):
     """
     Represents the FVM reading time calendar event device.
     """
 
     def __init__(
-        self, config_entry_id: str, controller: FvmController, meter: LocationAndMeter
+        self,
+        config_entry_id: str,
+        coordinator: FvmCoordinator,
+        meter: LocationAndMeter,
     ):
         """
         Initialize a new instance of FvmReadingTimeCalendarEventDevice class.
 
         Args:
             config_entry_id: The config_entry.entry_id which created the instance.
-            controller: The FVM controller instance.
+            coordinator: The coordinator which fetches the reading times of the meters.
             meter:The location and meter information.
         """
-        self._controller = controller
+        super().__init__(coordinator)
         self._meter = meter
         self._attr_name = (
             f"fvm_{meter.location_id}_{meter.meter_serial_number}_dictation_and_reading"
@@ -48,25 +81,24 @@ class FvmReadingTimeCalendarEventDevice(CalendarEntity):
             "_{meter.meter_serial_number}_dictation_and_reading"
         )
         self._dictation_and_reading_times: List[ReadingTime] = []
-        self._event: CalendarEvent | None = None
-        self._all_events = []
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        self._update_dictation_and_reading_times()
 
     @property
-    def event(self) -> Dict[str, Any]:
+    def event(self) -> Optional[CalendarEvent]:
         """
         Gets the next upcoming reading event.
         """
-        return self._event
-
-    async def async_update(self):
-        """
-        Updates the next event in the calendar.
-        """
-        await self._update_dictation_and_reading_times()
-        if len(self._dictation_and_reading_times) == 0:
-            self._event = None
-        else:
-            self._event = self._get_event(self._dictation_and_reading_times[0])
+        today = datetime.combine(date.today(), time.min)
+        return next(
+            (
+                self._get_event(reading_time)
+                for reading_time in self._dictation_and_reading_times
+                if reading_time.end >= today
+            ),
+            None,
+        )
 
     async def async_get_events(
         self, hass: HomeAssistantType, start_date: datetime, end_date: datetime
@@ -79,39 +111,49 @@ class FvmReadingTimeCalendarEventDevice(CalendarEntity):
             start_date: The datetime range start.
             end_date: The datetime range end.
         """
-        await self._update_dictation_and_reading_times()
-        local_zone = tz.tzlocal()
-        start_date = start_date.astimezone(local_zone).replace(tzinfo=None)
-        end_date = end_date.astimezone(local_zone).replace(tzinfo=None)
-
-        result: List[CalendarEvent] = []
-        for reading_time in self._dictation_and_reading_times:
-            latest_start = max(start_date, reading_time.start)
-            earliest_end = min(end_date, reading_time.end)
-            delta = (earliest_end - latest_start).days + 1
-            overlap = delta > 0
-            if overlap:
-                result.append(self._get_event(reading_time))
-        return result
-
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
-    async def _update_dictation_and_reading_times(self):
-        self._dictation_and_reading_times = sorted([
-            reading_time
-            for reading_time in await self._controller.get_dictation_and_reading_times(
-                self._meter.location_id, self._meter.meter_serial_number
+        start_date = start_date.astimezone(_LOCAL_ZONE).replace(tzinfo=None)
+        end_date = end_date.astimezone(_LOCAL_ZONE).replace(tzinfo=None)
+
+        start_index = bisect_left(self._ends, start_date)
+        end_index = bisect_right(self._starts, end_date)
+        return [
+            self._get_event(reading_time)
+            for reading_time in self._dictation_and_reading_times[start_index:end_index]
+            if reading_time.end >= start_date
+        ]
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """
+        Updates the reading times from the coordinator and writes the state.
+        """
+        self._update_dictation_and_reading_times()
+        super()._handle_coordinator_update()
+
+    def _update_dictation_and_reading_times(self):
+        """
+        Updates the reading times and the bisect keys of the window queries.
+        The ends are kept as a running maximum, so they are sorted even if the
+        reading periods nest.
+        """
+        self._dictation_and_reading_times = self.coordinator.data.get(self._meter, [])
+        self._starts = [
+            reading_time.start for reading_time in self._dictation_and_reading_times
+        ]
+        self._ends = list(
+            accumulate(
+                (
+                    reading_time.end
+                    for reading_time in self._dictation_and_reading_times
+                ),
+                max,
             )
-            if reading_time.end.date() >= date.today()
-        ], key=lambda reading_time: cast(ReadingTime, reading_time).start)
+        )
 
     @classmethod
-    def _get_event(cls, reading_time: ReadingTime) -> Dict[str, Any]:
-        return CalendarEvent(
-            start=reading_time.start.date(),
-            end=reading_time.end.date(),
-            summary=f"Fővárosi vízművek - {reading_time.mode}",
-            description=reading_time.mode,
-            location="https://ugyfelszolgalat.vizmuvek.hu/",
+    def _get_event(cls, reading_time: ReadingTime) -> CalendarEvent:
+        return _build_event(
+            reading_time.start_date, reading_time.end_date, reading_time.mode
         )
 
 
@@ -134,12 +176,12 @@ async def async_setup_entry(
 
     _LOGGER.info("Setting up FVM calendar events.")
 
-    controller = get_controller(hass, config_entry.data[CONF_USERNAME])
+    coordinator = hass.data[DOMAIN][DATA_COORDINATOR][config_entry.entry_id]
 
     async_add_entities(
         [
-            FvmReadingTimeCalendarEventDevice(config_entry.entry_id, controller, meter)
-            for meter in await controller.get_locations_and_meters()
+            FvmReadingTimeCalendarEventDevice(config_entry.entry_id, coordinator, meter)
+            for meter in coordinator.meters
         ]
     )
 
@@ -1,7 +1,7 @@
 """
 The configuration flow module for FVM integration.
 """
-from typing import Any, Dict, Union
+from typing import Any, Dict, Mapping, Union
 
 import voluptuous as vol
 from homeassistant.config_entries import (HANDLERS, ConfigEntry, ConfigFlow,
@@ -10,8 +10,13 @@ from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
-from custom_components.fvm.const import DOMAIN
-from custom_components.fvm.fvm_session import FvmCustomerServiceSession
+from .const import DOMAIN
+from .fvm_session import FvmCustomerServiceSession
+
+_USER_SCHEMA = vol.Schema(
+    {vol.Required(CONF_USERNAME): str, vol.Required(CONF_PASSWORD): str}
+)
+_REAUTH_SCHEMA = vol.Schema({vol.Required(CONF_PASSWORD): str})
 
 
 class FvmOptionsFlowHandler(OptionsFlow):
@@ -96,10 +101,6 @@ class FvmConfigFlow(ConfigFlow, domain=DOMAIN):
             user_input: The inputs filled by the user.
             It is `None` when the user enters to the step first time.
         """
-        data_schema = vol.Schema(
-            {vol.Required(CONF_USERNAME): str, vol.Required(CONF_PASSWORD): str}
-        )
-
         if user_input is not None:
             async with FvmCustomerServiceSession() as session:
                 if not await session.post_login(
@@ -107,7 +108,7 @@ class FvmConfigFlow(ConfigFlow, domain=DOMAIN):
                 ):
                     return self.async_show_form(
                         step_id="user",
-                        data_schema=data_schema,
+                        data_schema=_USER_SCHEMA,
                         errors={CONF_USERNAME: "invalid_username_or_password"},
                     )
 
@@ -125,5 +126,53 @@ class FvmConfigFlow(ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="user",
-            data_schema=data_schema,
+            data_schema=_USER_SCHEMA,
+        )
+
+    # pylint: disable=unused-argument
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """
+        Handles the step when the login of a configured account failed.
+
+        Args:
+            entry_data: The data of the config entry which failed to log in.
+        """
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: Union[dict[str, Any], None] = None
+    ) -> FlowResult:
+        """
+        Handles the step when the user sets the new password of the account.
+
+        Args:
+            user_input: The inputs filled by the user.
+            It is `None` when the user enters to the step first time.
+        """
+        config_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        username = config_entry.data[CONF_USERNAME]
+
+        if user_input is not None:
+            async with FvmCustomerServiceSession() as session:
+                if not await session.post_login(username, user_input[CONF_PASSWORD]):
+                    return self.async_show_form(
+                        step_id="reauth_confirm",
+                        data_schema=_REAUTH_SCHEMA,
+                        errors={"base": "invalid_username_or_password"},
+                        description_placeholders={"username": username},
+                    )
+
+            self.hass.config_entries.async_update_entry(
+                config_entry, data=config_entry.data | user_input
+            )
+            await self.hass.config_entries.async_reload(config_entry.entry_id)
+
+            return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=_REAUTH_SCHEMA,
+            description_placeholders={"username": username},
         )
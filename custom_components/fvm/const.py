@@ -4,3 +4,4 @@ Constants for Fővárosi Vízművek integration.
 DOMAIN = "fvm"
 
 DATA_CONTROLLER = "controller"
+DATA_COORDINATOR = "coordinator"
@@ -0,0 +1,47 @@
+"""
+Module for FVM data update coordinator.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List
+
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import DOMAIN
+from .fvm_controller import FvmController, LocationAndMeter, ReadingTime
+
+_LOGGER = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = timedelta(hours=12)
+
+
+# pylint: disable=too-few-public-methods
+class FvmCoordinator(DataUpdateCoordinator[Dict[LocationAndMeter, List[ReadingTime]]]):
+    """
+    Represents the coordinator which fetches the reading times of the meters.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistantType,
+        controller: FvmController,
+        meters: List[LocationAndMeter],
+    ):
+        """
+        Initialize a new instance of FvmCoordinator class.
+
+        Args:
+            hass: The Home Assistant instance.
+            controller: The FVM controller instance.
+            meters: The locations and meters of the user.
+        """
+        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=REFRESH_INTERVAL)
+        self.controller = controller
+        self.meters = meters
+
+    async def _async_update_data(self) -> Dict[LocationAndMeter, List[ReadingTime]]:
+        reading_times = await self.controller.get_dictation_and_reading_times_many(
+            self.meters, since=datetime.combine(date.today(), time.min)
+        )
+        return dict(zip(self.meters, reading_times))
@@ -1,17 +1,53 @@
 """
 Module for FVM controller.
 """
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Final, List
-
+import asyncio
+import operator
+import sys
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import aiohttp
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.typing import HomeAssistantType
 
-from custom_components.fvm.const import DATA_CONTROLLER, DOMAIN
-from custom_components.fvm.fvm_session import FvmCustomerServiceSession
+from .const import DATA_CONTROLLER, DOMAIN
+from .fvm_session import FvmCustomerServiceSession
+
+_T = TypeVar("_T")
+
+_by_start = operator.attrgetter("start")
+_location_fields = operator.itemgetter("FOGYH_MN", "ANLAGE", "SERGE")
+_reading_fields = operator.itemgetter("LEOIDOSZAK", "LEOMOD")
+
 
+_DATE_CACHE: Dict[str, datetime] = {}
 
-@dataclass
+
+def _parse_ymd(value: str, offset: int) -> datetime:
+    """
+    Parses a `YYYY.MM.DD` formatted date at the specified offset of the string.
+    The parsed dates are cached.
+
+    Args:
+        value: The string contains the date.
+        offset: The offset of the date in the string.
+
+    Returns:
+        The parsed date.
+    """
+    date_string = value[offset : offset + 10]
+    parsed = _DATE_CACHE.get(date_string)
+    if parsed is None:
+        parsed = datetime(
+            int(date_string[0:4]), int(date_string[5:7]), int(date_string[8:10])
+        )
+        _DATE_CACHE[date_string] = parsed
+    return parsed
+
+
+@dataclass(slots=True, frozen=True)
 class ReadingTime:
     """
     Represents a meter reading time.
@@ -20,21 +56,27 @@ class ReadingTime:
         start: The start date of the reading.
         end: The end date of the reading.
         mode: The reading mode.
+        start_date: The date part of `start`.
+        end_date: The date part of `end`.
     """
 
-    # pylint: disable=invalid-name
-    start: Final[datetime]
-    # pylint: disable=invalid-name
-    end: Final[datetime]
-    # pylint: disable=invalid-name
-    mode: Final[str]
+    start: datetime
+    end: datetime
+    mode: str
+    start_date: date = field(init=False, repr=False, compare=False)
+    end_date: date = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Computes the date parts once, the class is frozen."""
+        object.__setattr__(self, "start_date", self.start.date())
+        object.__setattr__(self, "end_date", self.end.date())
 
     def __repr__(self) -> str:
         """Returns the string representation of the class."""
         return f"{self.start}-{self.end}: {self.mode}"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LocationAndMeter:
     """
     Represents a location with a meter.
@@ -45,12 +87,9 @@ class LocationAndMeter:
         meter_serial_number: The meter's serial number.
     """
 
-    # pylint: disable=invalid-name
-    location_id: Final[str]
-    # pylint: disable=invalid-name
-    meter_serial_number: Final[str]
-    # pylint: disable=invalid-name
-    location_name: Final[str]
+    location_id: str
+    meter_serial_number: str
+    location_name: str
 
 
 class FvmController:
@@ -68,6 +107,10 @@ class FvmController:
         """
         self._username = username
         self._password = password
+        self._session: Optional[FvmCustomerServiceSession] = None
+        self._login_lock = asyncio.Lock()
+        self._closed = False
+        self._login_failed = False
 
     async def get_locations_and_meters(self) -> List[LocationAndMeter]:
         """
@@ -75,20 +118,23 @@ class FvmController:
 
         Returns:
             The registered locations and meters for the user.
+
+        Raises:
+            ConfigEntryAuthFailed: The login failed.
         """
-        async with FvmCustomerServiceSession() as session:
-            await session.get_root_page()
-            if await session.post_login(self._username, self._password):
-                locations = await session.get_locations_and_serial_numbers()
-                return [
-                    LocationAndMeter(
-                        location["FOGYH_MN"], location["ANLAGE"], location["SERGE"]
-                    )
-                    for location in locations["FogyHely"]["T_FOGYH"]
-                ]
+        locations = await self._request(
+            lambda session: session.get_locations_and_serial_numbers()
+        )
+        return [
+            LocationAndMeter(*_location_fields(location))
+            for location in locations["FogyHely"]["T_FOGYH"]
+        ]
 
     async def get_dictation_and_reading_times(
-        self, location_id: str, meter_serial_number: str
+        self,
+        location_id: str,
+        meter_serial_number: str,
+        since: Optional[datetime] = None,
     ) -> List[ReadingTime]:
         """
         Gets the dictation and reading times for the specified meter.
@@ -96,69 +142,198 @@ class FvmController:
         Args:
             location_id: The location id.
             meter_serial_number: The meter's serial number.
+            since:
+                If set only the reading times ending at or after this date
+                are returned.
 
         Returns:
             The reading times for the specified meter.
+
+        Raises:
+            ConfigEntryAuthFailed: The login failed.
         """
-        async with FvmCustomerServiceSession() as session:
-            await session.get_root_page()
-            if await session.post_login(self._username, self._password):
-                reading_data = await session.get_dictation_and_reading_times(
-                    location_id, meter_serial_number
-                )
+        reading_data: Dict[str, Any] = await self._request(
+            lambda session: session.get_dictation_and_reading_times(
+                location_id, meter_serial_number
+            )
+        )
+        reading_times = []
+        for reading in reading_data["DataModel"]["LeolvDiktIdoszakok"]:
+            period, mode = _reading_fields(reading)
+            end = _parse_ymd(period, 11)
+            if since is not None and end < since:
+                continue
+            reading_times.append(
+                ReadingTime(_parse_ymd(period, 0), end, sys.intern(mode))
+            )
+        reading_times.sort(key=_by_start)
+        return reading_times
+
+    async def get_dictation_and_reading_times_many(
+        self,
+        meters: List[LocationAndMeter],
+        since: Optional[datetime] = None,
+    ) -> List[List[ReadingTime]]:
+        """
+        Gets the dictation and reading times for the specified meters.
+        The requests are sent concurrently over the shared session.
+
+        Args:
+            meters: The locations and meters.
+            since:
+                If set only the reading times ending at or after this date
+                are returned.
+
+        Returns:
+            The reading times of the meters in the order of `meters`.
 
-                return sorted(
-                    [
-                        ReadingTime(
-                            datetime.strptime(reading["LEOIDOSZAK"][:10], "%Y.%m.%d"),
-                            datetime.strptime(reading["LEOIDOSZAK"][11:22], "%Y.%m.%d"),
-                            reading["LEOMOD"],
-                        )
-                        for reading in reading_data["DataModel"]["LeolvDiktIdoszakok"]
-                    ],
-                    key=lambda reading: reading.start,
+        Raises:
+            ConfigEntryAuthFailed: The login failed.
+        """
+        return await asyncio.gather(
+            *(
+                self.get_dictation_and_reading_times(
+                    meter.location_id,
+                    meter.meter_serial_number,
+                    since=since,
                 )
+                for meter in meters
+            )
+        )
+
+    async def login(self) -> None:
+        """
+        Creates and logs in the shared session of the controller if it is not done yet.
+
+        Raises:
+            ConfigEntryAuthFailed: The login failed.
+        """
+        await self._ensure_session()
+
+    async def close(self) -> None:
+        """
+        Closes the shared session of the controller.
+        """
+        self._closed = True
+        async with self._login_lock:
+            await self._close_session()
+
+    async def _ensure_session(self) -> FvmCustomerServiceSession:
+        """
+        Gets the shared session of the controller. The session is created
+        on first use and logged in whenever its login is not valid anymore.
+        Once the login is rejected no further login is attempted.
+
+        Returns:
+            The logged in session.
+
+        Raises:
+            ConfigEntryAuthFailed: The login failed.
+        """
+        async with self._login_lock:
+            if self._closed:
+                raise RuntimeError("The controller is closed")
+
+            if self._login_failed:
+                raise ConfigEntryAuthFailed(f"Login failed for {self._username}")
+
+            if self._session is None:
+                self._session = FvmCustomerServiceSession()
+                await self._session.open()
+
+            if not await self._session.ensure_logged_in(self._username, self._password):
+                self._login_failed = True
+                await self._close_session()
+                raise ConfigEntryAuthFailed(f"Login failed for {self._username}")
+
+            return self._session
+
+    async def _close_session(self) -> None:
+        if self._session is not None:
+            session = self._session
+            self._session = None
+            await session.close()
+
+    async def _request(
+        self, func: Callable[[FvmCustomerServiceSession], Awaitable[_T]]
+    ) -> _T:
+        """
+        Calls the specified function with the shared logged in session.
+        If the call fails the session logs in again and the call is retried once.
+        The session itself is kept open, other requests may still use it.
+
+        Args:
+            func: The function which performs the request on the session.
+
+        Returns:
+            The result of the function.
+
+        Raises:
+            ConfigEntryAuthFailed: The login failed.
+        """
+        session = await self._ensure_session()
+        try:
+            return await func(session)
+        except aiohttp.ClientError:
+            session.invalidate_login()
+
+        return await func(await self._ensure_session())
 
 
 def set_controller(
-    hass: HomeAssistantType, user_name: str, controller: FvmController
+    hass: HomeAssistantType, entry_id: str, controller: FvmController
 ) -> None:
     """
-    Sets the controller instance for the specified username in Home Assistant data container.
+    Sets the controller instance for the specified config entry in Home Assistant
+    data container. The container holds weak references only, the caller has to
+    keep the controller alive.
 
     Args:
         hass: The Home Assistant instance.
-        user_name: The registered username.
+        entry_id: The id of the config entry.
         controller: The controller instance to set.
     """
-    hass.data[DOMAIN][DATA_CONTROLLER][user_name] = controller
+    hass.data[DOMAIN][DATA_CONTROLLER][entry_id] = controller
 
 
-def get_controller(hass: HomeAssistantType, user_name: str) -> FvmController:
+def get_controller(hass: HomeAssistantType, entry_id: str) -> FvmController:
     """
-    Gets the controller instance for the specified username from Home Assistant data container.
+    Gets the controller instance for the specified config entry from Home Assistant
+    data container.
 
     Args:
         hass: The Home Assistant instance.
-        user_name: The registered username.
+        entry_id: The id of the config entry.
 
     Returns:
-        The controller associated to the specified username.
+        The controller associated to the specified config entry.
     """
-    return hass.data[DOMAIN][DATA_CONTROLLER].get(user_name)
+    return hass.data[DOMAIN][DATA_CONTROLLER].get(entry_id)
 
 
-def is_controller_exists(hass: HomeAssistantType, user_name: str) -> bool:
+def is_controller_exists(hass: HomeAssistantType, entry_id: str) -> bool:
     """
     Gets the value indicates whether a controller associated to the specified
-    username in Home Assistant data container.
+    config entry in Home Assistant data container.
 
     Args:
         hass: The Home Assistant instance.
-        user_name: The registered username.
+        entry_id: The id of the config entry.
 
     Returns:
         The value indicates whether a controller associated to the specified
-        username in Home Assistant data container.
+        config entry in Home Assistant data container.
+    """
+    return entry_id in hass.data[DOMAIN][DATA_CONTROLLER]
+
+
+def remove_controller(hass: HomeAssistantType, entry_id: str) -> None:
+    """
+    Removes the controller instance of the specified config entry from Home Assistant
+    data container.
+
+    Args:
+        hass: The Home Assistant instance.
+        entry_id: The id of the config entry.
     """
-    return user_name in hass.data[DOMAIN][DATA_CONTROLLER]
+    hass.data[DOMAIN][DATA_CONTROLLER].pop(entry_id, None)
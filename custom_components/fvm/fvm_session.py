@@ -1,15 +1,31 @@
 """
 Module for FVM session.
 """
+import json
 import re
-from datetime import datetime
+import time
 from types import TracebackType
-from typing import Any, Dict, Optional, Type
+from typing import Any, Dict, FrozenSet, Optional, Type
 
 import aiohttp
+from yarl import URL
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 ROOT_URL = "https://ugyfelszolgalat.vizmuvek.hu"
 
+CONNECTION_LIMIT = 4
+KEEPALIVE_TIMEOUT = 75
+
+TOKEN_REJECTED_STATUSES = (403, 419)
+
+_TOKEN_RE = re.compile(
+    rb'name="__RequestVerificationToken" type="hidden" value="([^"]+)"'
+)
+
 
 class FvmCustomerServiceSession:
     """
@@ -17,14 +33,23 @@ class FvmCustomerServiceSession:
     a session at https://ugyfelszolgalat.vizmuvek.hu.
     """
 
+    # pylint: disable=no-member
+    _json_loads = staticmethod(orjson.loads if orjson is not None else json.loads)
+    _json_dumps = staticmethod(orjson.dumps if orjson is not None else json.dumps)
+    # pylint: enable=no-member
+
     def __init__(self):
         """
         Initialize a new instance of VizmuvekCustomerServiceSession class.
         """
         self._session = None
+        self._verification_token: Optional[str] = None
+        self._authenticated = False
+        self._auth_cookie_names: FrozenSet[str] = frozenset()
+        self._root_page_loaded = False
 
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession()
+        await self.open()
         return self
 
     async def __aexit__(
@@ -33,7 +58,23 @@ class FvmCustomerServiceSession:
         exc_val: Optional[BaseException],
         exc_tb: Optional[TracebackType],
     ):
-        await self._session.__aexit__(exc_type, exc_val, exc_tb)
+        await self.close()
+
+    async def open(self) -> None:
+        """
+        Opens the underlying HTTP session.
+        """
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT, keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+        )
+
+    async def close(self) -> None:
+        """
+        Closes the underlying HTTP session.
+        """
+        await self._session.close()
 
     async def get_root_page(self) -> bytes:
         """
@@ -45,7 +86,41 @@ class FvmCustomerServiceSession:
             The root page content.
         """
         async with self._session.get(ROOT_URL) as response:
-            return await response.read()
+            root_page = await response.read()
+            self._root_page_loaded = True
+            return root_page
+
+    async def ensure_logged_in(self, username: str, password: str) -> bool:
+        """
+        Logs in unless the session is already logged in and its authentication
+        cookies are still valid. The root page is loaded only once per session,
+        or again on the next login after a failed one. A failed login is not retried.
+
+        Args:
+            username: The username.
+            password: The password.
+
+        Returns:
+            The value indicates whether the session is logged in.
+        """
+        if self._authenticated and self._has_auth_cookies():
+            return True
+
+        if not self._root_page_loaded:
+            await self.get_root_page()
+
+        if await self.post_login(username, password):
+            return True
+
+        self._root_page_loaded = False
+        return False
+
+    def invalidate_login(self) -> None:
+        """
+        Marks the session as logged out, e.g. when a request is rejected.
+        """
+        self._authenticated = False
+        self._verification_token = None
 
     async def post_login(self, username: str, password: str) -> bool:
         """
@@ -62,12 +137,7 @@ class FvmCustomerServiceSession:
             f"{ROOT_URL}/Fiok/Bejelentkezes?ReturnUrl=/&_={self._get_timestamp()}",
             headers={"X-Requested-With": "XMLHttpRequest"},
         ) as response:
-            response_text = await response.text()
-            login_verification_token = re.search(
-                '<input name="__RequestVerificationToken" type="hidden" value="(.*)" />',
-                response_text,
-                flags=re.MULTILINE,
-            ).group(1)
+            login_verification_token = await self._read_token(response)
 
             resp = await self._session.post(
                 f"{ROOT_URL}/Fiok/Bejelentkezes?ReturnUrl=%2F",
@@ -79,8 +149,15 @@ class FvmCustomerServiceSession:
                 headers={"X-Requested-With": "XMLHttpRequest"},
             )
 
-            login_result = await resp.json()
-            return login_result["Success"] and login_result["Object"]["Success"]
+            login_result = await resp.json(loads=self._json_loads)
+            self._authenticated = (
+                login_result["Success"] and login_result["Object"]["Success"]
+            )
+            self._auth_cookie_names = (
+                frozenset(resp.cookies) if self._authenticated else frozenset()
+            )
+            self._verification_token = None
+            return self._authenticated
 
     async def get_locations_and_serial_numbers(self) -> Dict[str, Any]:
         """
@@ -93,7 +170,7 @@ class FvmCustomerServiceSession:
             f"{ROOT_URL}/Meroallas/GetDiktLeolvIdoszakFogyHelyek?_={self._get_timestamp()}",
             headers={"X-Requested-With": "XMLHttpRequest"},
         ) as params_request:
-            return await params_request.json()
+            return await params_request.json(loads=self._json_loads)
 
     async def get_dictation_and_reading_times(
         self, anlage: str, serge: str
@@ -108,30 +185,53 @@ class FvmCustomerServiceSession:
         Returns:
             The locations and meter serial numbers.
         """
+        if self._verification_token is not None:
+            async with self._post_dictation_and_reading_times(
+                anlage, serge
+            ) as response:
+                if response.status not in TOKEN_REJECTED_STATUSES:
+                    response.raise_for_status()
+                    return await response.json(loads=self._json_loads)
+
+        self._verification_token = await self._get_dictation_verification_token()
+        async with self._post_dictation_and_reading_times(anlage, serge) as response:
+            response.raise_for_status()
+            return await response.json(loads=self._json_loads)
+
+    async def _get_dictation_verification_token(self) -> str:
         async with self._session.get(
             f"{ROOT_URL}/Meroallas/LeolvasasiDiktalasiIdoszak?_={self._get_timestamp()}",
             headers={"X-Requested-With": "XMLHttpRequest"},
         ) as response:
-            text = await response.text()
-            verification_token = re.search(
-                '<input name="__RequestVerificationToken" type="hidden" value="(.*)" />',
-                text,
-                flags=re.MULTILINE,
-            ).group(1)
-
-            async with self._session.post(
-                f"{ROOT_URL}/Meroallas/GetDiktalasiLeolvasasiIdoszakLisa",
-                headers={
-                    "VerificationToken": verification_token,
-                    "X-Requested-With": "XMLHttpRequest",
-                    "Accept": "application/json, text/javascript, */*; q=0.01",
-                    "Content-Type": "application/json; charset=UTF-8",
-                    "Cache-Control": "no-cache",
-                },
-                data=f'{{"param": {{"I_ANLAGE": "{anlage}", "I_SERGE": "{serge}"}}}}',
-            ) as reading_list_response:
-                return await reading_list_response.json()
+            return await self._read_token(response)
+
+    def _post_dictation_and_reading_times(self, anlage: str, serge: str):
+        return self._session.post(
+            f"{ROOT_URL}/Meroallas/GetDiktalasiLeolvasasiIdoszakLisa",
+            headers={
+                "VerificationToken": self._verification_token,
+                "X-Requested-With": "XMLHttpRequest",
+                "Accept": "application/json, text/javascript, */*; q=0.01",
+                "Content-Type": "application/json; charset=UTF-8",
+                "Cache-Control": "no-cache",
+            },
+            data=self._json_dumps({"param": {"I_ANLAGE": anlage, "I_SERGE": serge}}),
+        )
+
+    def _has_auth_cookies(self) -> bool:
+        cookies = self._session.cookie_jar.filter_cookies(URL(ROOT_URL))
+        return all(name in cookies for name in self._auth_cookie_names)
+
+    @classmethod
+    async def _read_token(cls, response: aiohttp.ClientResponse) -> str:
+        match = _TOKEN_RE.search(await response.read())
+        if match:
+            return match.group(1).decode("ascii")
+
+        raise aiohttp.ClientPayloadError(
+            f"Verification token not found in the response of {response.url}"
+        )
 
     @classmethod
     def _get_timestamp(cls):
-        return round(datetime.now().timestamp() * 1000)
+        return int(time.time() * 1000)